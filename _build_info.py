@@ -0,0 +1,3 @@
+# Release metadata shown in the app footer. Update on each deploy.
+LAST_UPDATED = "Febreray 4, 2026"
+VERSION = "0.1"
@@ -1,28 +1,141 @@
+import functools
+import hashlib
+import io
 import os
-from datetime import datetime
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
 
 import streamlit as st
-from cba_generator import generate_cba_from_uploaded_template
+from _build_info import LAST_UPDATED, VERSION
+
+_TITLE_HTML = """
+<style>
+  .cba-title { font-size: 32px; color: #0B5394; margin: 0 0 0.25rem 0; }
+</style>
+<div class="cba-title">TEG Choose-By-Advantage Matrix Formatter</div>
+"""
+
+_OUTPUT_DIR = Path(tempfile.gettempdir()) / "cba_outputs"
+_OUTPUT_TTL_S = 3600
 
 st.set_page_config(page_title="CBA Matrix Generator", layout="centered")
 
-st.markdown(
-    """
-    <style>
-      .cba-title { font-size: 32px; color: #0B5394; margin: 0 0 0.25rem 0; }
-    </style>
-    <div class="cba-title">TEG Choose-By-Advantage Matrix Formatter</div>
-    """,
-    unsafe_allow_html=True,
-)
 
-# Session storage
-if "xlsx_bytes" not in st.session_state:
-    st.session_state.xlsx_bytes = None
-if "out_name" not in st.session_state:
+@functools.cache
+def _gen():
+    # cba_generator pulls in pandas and openpyxl; import it on first use so the form paints first.
+    from cba_generator import generate_cba_from_uploaded_template
+
+    return generate_cba_from_uploaded_template
+
+
+@st.cache_resource(max_entries=8)
+def _load_template_wb(file_digest: str, _raw: bytes):
+    # Parsed once per template and shared across sessions; the generator never mutates it.
+    from openpyxl import load_workbook
+
+    return load_workbook(io.BytesIO(_raw), data_only=True, keep_links=False)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_generate(
+    file_digest: str,
+    _file_bytes: bytes,
+    purpose: str,
+    project_name: str,
+    project_location: str,
+    today_iso: str,
+) -> tuple[bytes, str]:
+    # Identical inputs return the cached workbook across reruns and sessions on this worker.
+    # The leading underscore keeps Streamlit from re-hashing the bytes; file_digest is the key.
+    # The date is part of the key because it is printed in the sheets and the file name.
+    return _gen()(
+        uploaded_xlsx_bytes=_file_bytes,
+        purpose=purpose,
+        project_name=project_name,
+        project_location=project_location,
+        sheet_name=None,
+        workbook=_load_template_wb(file_digest, _file_bytes),
+        today=date.fromisoformat(today_iso),
+    )
+
+
+@st.cache_resource
+def _pool() -> ThreadPoolExecutor:
+    # Shared by all sessions; generation runs here so the script run is never blocked on openpyxl.
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def _read_upload(uploaded) -> tuple[bytes, str]:
+    # Copy and hash each upload once; only the most recent file is kept per session.
+    fid = getattr(uploaded, "file_id", None) or (uploaded.name, uploaded.size)
+    cache = st.session_state.setdefault("_upload_bytes_cache", {})
+    if fid not in cache:
+        cache.clear()
+        raw = uploaded.getvalue()
+        cache[fid] = (raw, hashlib.blake2b(raw, digest_size=16).hexdigest())
+    return cache[fid]
+
+
+def _store_output(xlsx_bytes: bytes) -> str:
+    # Keep the generated workbook on disk instead of holding the blob in session state.
+    # Sessions that end without downloading leave their file behind, so sweep stale ones first.
+    _OUTPUT_DIR.mkdir(exist_ok=True)
+    cutoff = time.time() - _OUTPUT_TTL_S
+    for stale in _OUTPUT_DIR.glob("cba_*"):
+        try:
+            if stale.stat().st_mtime < cutoff:
+                stale.unlink()
+        except OSError:
+            pass
+
+    fd, path = tempfile.mkstemp(prefix="cba_", suffix=".xlsx", dir=_OUTPUT_DIR)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(xlsx_bytes)
+    return path
+
+
+def _take_output(path: str) -> bytes:
+    # Runs when Download is clicked: read the file, then remove it so nothing outlives the download.
+    # The empty marker tells the next rerun the file went away by download, not by the stale sweep.
+    p = Path(path)
+    data = p.read_bytes()
+    Path(path + ".done").touch()
+    p.unlink(missing_ok=True)
+    return data
+
+
+def _forget_output() -> None:
+    st.session_state.xlsx_path = None
     st.session_state.out_name = None
-if "last_inputs_sig" not in st.session_state:
-    st.session_state.last_inputs_sig = None
+
+
+def _discard_output() -> None:
+    if st.session_state.xlsx_path:
+        Path(st.session_state.xlsx_path).unlink(missing_ok=True)
+        Path(st.session_state.xlsx_path + ".done").unlink(missing_ok=True)
+    _forget_output()
+
+
+def _validate(purpose, project_name, project_location, uploaded) -> list[str]:
+    # Labels of the required inputs that are still empty; text inputs arrive already stripped.
+    fields = {
+        "Purpose": purpose,
+        "Project Name": project_name,
+        "Project Location": project_location,
+        "Template XLSX": uploaded,
+    }
+    return [label for label, value in fields.items() if not value]
+
+
+st.markdown(_TITLE_HTML, unsafe_allow_html=True)
+
+# Session storage
+for key in ("xlsx_path", "out_name", "fut"):
+    st.session_state.setdefault(key, None)
 
 # --- Purpose OUTSIDE form so "Other" input appears immediately ---
 purpose_choice = st.selectbox(
@@ -45,60 +158,74 @@ else:
 
 # --- Form for the rest (prevents rerun while typing) ---
 with st.form("cba_form", clear_on_submit=False):
-    project_name = st.text_input("Project Name:", value="")
-    project_location = st.text_input("Project Location:", value="")
+    project_name = st.text_input("Project Name:", value="").strip()
+    project_location = st.text_input("Project Location:", value="").strip()
     uploaded = st.file_uploader("Upload your XLSX file from Custom GPT", type=["xlsx", "xlsm"])
     submitted = st.form_submit_button("Generate")
 
 # Only run generation when user clicks Generate
 if submitted:
-    missing = []
-    if not purpose:
-        missing.append("Purpose")
-    if not project_name.strip():
-        missing.append("Project Name")
-    if not project_location.strip():
-        missing.append("Project Location")
-    if uploaded is None:
-        missing.append("Template XLSX")
+    missing = _validate(purpose, project_name, project_location, uploaded)
 
     if missing:
-        st.session_state.xlsx_bytes = None
-        st.session_state.out_name = None
+        st.session_state.fut = None
+        _discard_output()
         st.error("Please fill in: " + ", ".join(missing))
     else:
-        inputs_sig = (
+        raw, digest = _read_upload(uploaded)
+
+        st.session_state.fut = _pool().submit(
+            _cached_generate,
+            digest,
+            raw,
             purpose,
-            project_name.strip(),
-            project_location.strip(),
-            uploaded.name,
-            uploaded.size,
+            project_name,
+            project_location,
+            date.today().isoformat(),
         )
 
-        if inputs_sig != st.session_state.last_inputs_sig:
-            with st.spinner("Generating formatted workbook..."):
-                st.session_state.xlsx_bytes, st.session_state.out_name = generate_cba_from_uploaded_template(
-                    uploaded_xlsx_bytes=uploaded.getvalue(),
-                    purpose=purpose,
-                    project_name=project_name.strip(),
-                    project_location=project_location.strip(),
-                    sheet_name=None,
-                )
-            st.session_state.last_inputs_sig = inputs_sig
+# Poll the background job; rerun until it finishes so the page stays interactive meanwhile
+fut = st.session_state.fut
+if fut is not None:
+    if fut.done():
+        st.session_state.fut = None
+        xlsx_bytes, out_name = fut.result()
+
+        _discard_output()
+        st.session_state.xlsx_path = _store_output(xlsx_bytes)
+        st.session_state.out_name = out_name
+        # Hold one blob per session: the upload is no longer needed once the output exists.
+        st.session_state.pop("_upload_bytes_cache", None)
 
         st.success("The formatted Excel file is generated. Click Download to download.")
+    else:
+        st.info("Generating formatted workbook...")
+        time.sleep(0.3)
+        st.rerun()
+
+# The output file is gone either because it was downloaded or because another session's sweep
+# removed it as stale; only the latter needs telling.
+if st.session_state.xlsx_path and not Path(st.session_state.xlsx_path).is_file():
+    if not Path(st.session_state.xlsx_path + ".done").is_file():
+        st.warning("The generated file has expired. Click Generate to create it again.")
+    _discard_output()
 
 # Download always visible when output exists
-if st.session_state.xlsx_bytes:
+if st.session_state.xlsx_path:
+    # A callable is only run when Download is clicked, so reruns never read or register the file.
+    # It deletes the file itself. The click must not rerun: a rerun that drops the button lets
+    # Streamlit discard the callable before its server thread has fetched it. The missing-file
+    # check above clears the output on the next rerun instead.
     st.download_button(
         "Download",
-        data=st.session_state.xlsx_bytes,
+        data=functools.partial(_take_output, st.session_state.xlsx_path),
         file_name=st.session_state.out_name or "CBA.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",
     )
-else:
+elif st.session_state.fut is None:
     st.info("Fill in the fields, upload the file, then click Generate to generate the formatted Excel file.")
 
 # Footer
 st.markdown("---")
-st.caption("Last updated on Febreray 4, 2026. Version 0.1")
+st.caption(f"Last updated on {LAST_UPDATED}. Version {VERSION}")
@@ -3,20 +3,223 @@ from __future__ import annotations
 import io
 import re
 from datetime import date
+from functools import lru_cache
 from io import BytesIO
+from itertools import product
 from typing import Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.formatting.rule import Rule
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.styles.differential import DifferentialStyle
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.worksheet.datavalidation import DataValidation
 
-
+SECTION_BAND_FILL = "f5f5f5"
+ROWLABEL_FILL = "f0f0f0"
+BORDER_COLOR = "000000"
+TITLE_SIZE = 18
+HEADER_FONT_SIZE = 12
+SECTION_TEXT_ROTATE = 90
+
+# openpyxl style objects are immutable, so one instance is shared by every cell that uses it.
+BOLD = Font(bold=True)
+BOLD14 = Font(bold=True, size=14)
+BOLD_HDR = Font(bold=True, size=HEADER_FONT_SIZE)
+TITLE_FONT = Font(bold=True, size=TITLE_SIZE)
+
+ROWLABEL_PF = PatternFill("solid", fgColor=ROWLABEL_FILL)
+BAND_PF = PatternFill("solid", fgColor=SECTION_BAND_FILL)
+
+CENTER = Alignment(horizontal="center", vertical="center", wrap_text=True)
+LEFT = Alignment(horizontal="left", vertical="top", wrap_text=True)
+LABEL_LEFT = Alignment(horizontal="left", vertical="center", wrap_text=True)
+TITLE_CENTER = Alignment(horizontal="center", vertical="center")
+INFO_RIGHT = Alignment(horizontal="right", vertical="center")
+VERT_CENTER = Alignment(
+    horizontal="center",
+    vertical="center",
+    textRotation=SECTION_TEXT_ROTATE,
+    wrap_text=True,
+)
+
+THICK = Side(style="thick", color=BORDER_COLOR)
+THIN = Side(style="thin", color=BORDER_COLOR)
+MEDIUM = Side(style="medium", color=BORDER_COLOR)
+
+_SIDES = {"thick": THICK, "thin": THIN, "medium": MEDIUM}
+
+# Every (left, right, top, bottom) combination of side kinds used by the table grids.
+BORDERS = {
+    (left, right, top, bottom): Border(
+        left=_SIDES[left],
+        right=_SIDES[right],
+        top=_SIDES[top],
+        bottom=_SIDES[bottom],
+    )
+    for left, right, top, bottom in product(_SIDES, repeat=4)
+}
+
+
+_SAFE_NAME_RE = re.compile(r'[\\/*?:<>|"]+')
+_SEP_RE = re.compile(r"[;\n]| [•–-] ")
+_LEAD_BULLET_RE = re.compile(r"^\s*[-•–]\s*")
+_RATING_RE = re.compile(
+    r"^\s*(very\s+good|excellent|good|fair|poor|\d(?:\.0)?)\s*(?:[:\-–—]\s*(.*))?$",
+    re.I,
+)
+
+# Rating word for each token _RATING_RE captures (lowercased). Anything else it can match, such as
+# 0, 6-9 or "very  good" with extra spaces, has no rating.
+_RATING_TOKEN_TO_WORD = {
+    "poor": "Poor",
+    "fair": "Fair",
+    "good": "Good",
+    "very good": "Very Good",
+    "excellent": "Excellent",
+    "1": "Poor",
+    "2": "Fair",
+    "3": "Good",
+    "4": "Very Good",
+    "5": "Excellent",
+    "1.0": "Poor",
+    "2.0": "Fair",
+    "3.0": "Good",
+    "4.0": "Very Good",
+    "5.0": "Excellent",
+}
+
+DESC_ROWS = {"illustration", "description", "feasibility", "advantages", "disadvantages", "scheme"}
+
+CONSID_ROWS = {
+    "foundation installation schedule",
+    "installation schedule",
+    "equipment/subcontractors necessary for foundations",
+    "equipment/subcontractors",
+    "spoils handling",
+    "certainty of improvement",
+    "authority having jurisdiction approval",
+    "noise",
+    "vibration",
+    "cost",
+    "market competition",
+    "market familiarity",
+}
+
+# Section of each known (lowercased) row label; anything else goes under Construction Considerations.
+_ROW_SECTION = {**dict.fromkeys(DESC_ROWS, "desc"), **dict.fromkeys(CONSID_ROWS, "consid")}
+
+
+@lru_cache(maxsize=128)
 def safe_name(s: str) -> str:
-    return re.sub(r'[\\/*?:<>|"]+', "", s)
+    return _SAFE_NAME_RE.sub("", s)
+
+
+@lru_cache(maxsize=None)
+def _fill_dxf(hexcol: str) -> DifferentialStyle:
+    # Conditional-format fill for one colour, shared by every rule and sheet that uses it.
+    return DifferentialStyle(fill=PatternFill(fill_type="solid", start_color=hexcol, end_color=hexcol))
+
+
+def bulletize(text):
+    if text is None:
+        return ""
+    s = str(text).strip()
+    if not s:
+        return ""
+    if _SEP_RE.search(s):
+        s = _SEP_RE.sub("\n", s.replace("\r", ""))
+        lines = [_LEAD_BULLET_RE.sub("", ln).strip() for ln in s.split("\n")]
+        lines = [ln for ln in lines if ln]
+        if lines:
+            return "• " + "\n• ".join(lines)
+    return s
+
+
+class _RowBuffer:
+    """Collect cells for a write-only worksheet and append them in row order on flush.
+
+    Write-only sheets stream rows and cannot be revisited, while the matrix layout
+    fills cells out of order (merged rating/description pairs, section bands, borders).
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.rows = []
+
+    def cell(self, row: int, column: int, value=None):
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        if len(cells) < column:
+            cells.extend([None] * (column - len(cells)))
+        c = cells[column - 1]
+        if c is None:
+            c = cells[column - 1] = WriteOnlyCell(self.ws)
+        if value is not None:
+            c.value = value
+        return c
+
+    def set_cell(
+        self,
+        row: int,
+        column: int,
+        value=None,
+        font=None,
+        fill=None,
+        alignment=None,
+        border=None,
+        number_format=None,
+    ):
+        # One cell lookup, then only the shared style objects that were passed in.
+        c = self.cell(row, column, value)
+        if font is not None:
+            c.font = font
+        if fill is not None:
+            c.fill = fill
+        if alignment is not None:
+            c.alignment = alignment
+        if border is not None:
+            c.border = border
+        if number_format is not None:
+            c.number_format = number_format
+        return c
+
+    def merge_cells(self, start_row: int, start_column: int, end_row: int, end_column: int) -> None:
+        self.ws.merged_cells.add(
+            CellRange(min_col=start_column, min_row=start_row, max_col=end_column, max_row=end_row)
+        )
+
+    def flush(self) -> None:
+        for cells in self.rows:
+            self.ws.append(cells)
+
+
+def _write_title(buf: _RowBuffer, row: int, ncols: int, title: str) -> None:
+    buf.merge_cells(start_row=row, start_column=1, end_row=row, end_column=ncols)
+    buf.set_cell(row, 1, title, font=TITLE_FONT, alignment=TITLE_CENTER)
+
+
+def _write_project_header(
+    buf: _RowBuffer, row: int, ncols: int, project_name: str, project_location: str, today_str: str
+) -> None:
+    # Name, location and date share the row in roughly quarter / half / quarter merged blocks.
+    left_end = max(2, int(ncols * 0.25))
+    right_start = max(left_end + 1, ncols - max(2, int(ncols * 0.25)) + 1)
+    mid_start = left_end + 1
+    mid_end = right_start - 1
+
+    buf.merge_cells(start_row=row, start_column=1, end_row=row, end_column=left_end)
+    buf.merge_cells(start_row=row, start_column=mid_start, end_row=row, end_column=mid_end)
+    buf.merge_cells(start_row=row, start_column=right_start, end_row=row, end_column=ncols)
+
+    buf.set_cell(row, 1, f"Project Name: {project_name}", font=BOLD14)
+    buf.set_cell(row, mid_start, f"Project Location: {project_location}", font=BOLD14, alignment=TITLE_CENTER)
+    buf.set_cell(row, right_start, f"Date: {today_str}", font=BOLD14, alignment=INFO_RIGHT)
 
 
 def generate_cba_from_uploaded_template(
@@ -25,15 +228,14 @@ def generate_cba_from_uploaded_template(
     project_name: str,
     project_location: str,
     sheet_name: Optional[str] = None,
+    workbook: Optional[Workbook] = None,
+    today: Optional[date] = None,
 ) -> Tuple[bytes, str]:
 
     TITLE = f"Choose-by-Advantage Matrix for the {purpose}"
-    SECTION_BAND_FILL = "f5f5f5"
-    ROWLABEL_FILL = "f0f0f0"
-    BORDER_COLOR = "000000"
-    TITLE_SIZE = 18
-    HEADER_FONT_SIZE = 12
-    SECTION_TEXT_ROTATE = 90
+    if today is None:
+        today = date.today()
+    today_str = f"{today:%B %d, %Y}"
 
     RATING_WORDS = ["Poor", "Fair", "Good", "Very Good", "Excellent"]
     RATING_COLOR = {
@@ -44,49 +246,9 @@ def generate_cba_from_uploaded_template(
         "Excellent": "19CB01",
     }
 
-    WORD_TO_NUM = {"poor": 1, "fair": 2, "good": 3, "very good": 4, "excellent": 5}
-
-    DESC_ROWS = {"illustration", "description", "feasibility", "advantages", "disadvantages", "scheme"}
-
-    CONSID_ROWS = {
-        "foundation installation schedule",
-        "installation schedule",
-        "equipment/subcontractors necessary for foundations",
-        "equipment/subcontractors",
-        "spoils handling",
-        "certainty of improvement",
-        "authority having jurisdiction approval",
-        "noise",
-        "vibration",
-        "cost",
-        "market competition",
-        "market familiarity",
-    }
-
     # Only these rows should be bulletized.
     BULLET_ROWS = {"advantages", "disadvantages"}
 
-    def bulletize(text):
-        if text is None:
-            return ""
-        s = str(text).strip()
-        if not s:
-            return ""
-        if any(sep in s for sep in ["\n", ";", " • ", " - ", " – "]):
-            s = s.replace("\r", "")
-            for sep in [";", " • ", " – ", " - "]:
-                s = s.replace(sep, "\n")
-            lines = [re.sub(r"^\s*[-•–]\s*", "", ln).strip() for ln in s.split("\n")]
-            lines = [ln for ln in lines if ln]
-            if lines:
-                return "• " + "\n• ".join(lines)
-        return s
-
-    _RATING_RE = re.compile(
-        r"^\s*(very\s+good|excellent|good|fair|poor|\d(?:\.0)?)\s*(?:[:\-–—]\s*(.*))?$",
-        re.I,
-    )
-
     def split_rating_and_desc(raw):
         if raw is None or str(raw).strip() == "":
             return "", ""
@@ -97,21 +259,18 @@ def generate_cba_from_uploaded_template(
         if not m:
             return "", s
 
-        rt = m.group(1).lower()
-
-        if rt in WORD_TO_NUM:
-            rating_word = "Very Good" if rt == "very good" else rt.title()
-        else:
-            try:
-                rating_word = ["", "Poor", "Fair", "Good", "Very Good", "Excellent"][int(float(rt))]
-            except Exception:
-                rating_word = ""
+        rating_word = _RATING_TOKEN_TO_WORD.get(m.group(1).lower(), "")
 
         return rating_word, (m.group(2) or "")
 
-    xls = pd.ExcelFile(io.BytesIO(uploaded_xlsx_bytes), engine="openpyxl")
-    sheet_to_use = xls.sheet_names[0] if sheet_name is None else sheet_name
-    df0 = pd.read_excel(xls, sheet_name=sheet_to_use, engine="openpyxl")
+    # A pre-loaded template workbook is only read from, so it can be shared between calls.
+    source = workbook if workbook is not None else io.BytesIO(uploaded_xlsx_bytes)
+    df0 = pd.read_excel(
+        source,
+        sheet_name=0 if sheet_name is None else sheet_name,
+        engine="openpyxl",
+        dtype=object,
+    )
 
     df0.columns = [str(c).strip() for c in df0.columns]
     row_label_header = df0.columns[0]
@@ -120,66 +279,49 @@ def generate_cba_from_uploaded_template(
     labels = [str(x) for x in df0.iloc[:, 0].tolist()]
     lower = [x.strip().lower() for x in labels]
 
-    if "illustration" not in lower:
-        df0 = pd.concat(
-            [pd.DataFrame([["Illustration"] + [""] * len(options)], columns=df0.columns), df0],
-            ignore_index=True,
-        )
-        labels = [str(x) for x in df0.iloc[:, 0].tolist()]
-        lower = [x.strip().lower() for x in labels]
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Matrix"
-
-    THICK = Side(style="thick", color=BORDER_COLOR)
-    THIN = Side(style="thin", color=BORDER_COLOR)
-    MEDIUM = Side(style="medium", color=BORDER_COLOR)
-
-    CENTER = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    LEFT = Alignment(horizontal="left", vertical="top", wrap_text=True)
-    VERT_CENTER = Alignment(
-        horizontal="center",
-        vertical="center",
-        textRotation=SECTION_TEXT_ROTATE,
-        wrap_text=True,
-    )
+    # Plain object array for the per-cell reads below; pandas' .iat indexer is far slower.
+    raw_arr = df0.to_numpy(dtype=object)
+    ncols_df = raw_arr.shape[1]
 
-    ncols = 2 + len(options)
-
-    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=ncols)
-    t = ws.cell(row=1, column=1, value=TITLE)
-    t.font = Font(bold=True, size=TITLE_SIZE)
-    t.alignment = Alignment(horizontal="center", vertical="center")
-
-    info_r = 2
-    left_end = max(2, int(ncols * 0.25))
-    right_start = max(left_end + 1, ncols - max(2, int(ncols * 0.25)) + 1)
-    mid_start = left_end + 1
-    mid_end = right_start - 1
+    if "illustration" not in lower:
+        # Prepend the blank Illustration row to the array and label lists only; nothing reads df0 again.
+        labels.insert(0, "Illustration")
+        lower.insert(0, "illustration")
+        blank_row = np.array([["Illustration"] + [""] * (ncols_df - 1)], dtype=object)
+        raw_arr = np.vstack([blank_row, raw_arr])
+
+    # Split every option cell into (rating word, description) in one pass so the layout loops
+    # below only index the result. pandas' .str.extract would not help: on object columns it
+    # runs the same per-element regex in Python and stringifies missing values per version.
+    parsed = [
+        [
+            split_rating_and_desc(raw_arr[i, df_col] if df_col < ncols_df else "")
+            for df_col in range(1, len(options) + 1)
+        ]
+        for i in range(len(labels))
+    ]
 
-    ws.merge_cells(start_row=info_r, start_column=1, end_row=info_r, end_column=left_end)
-    ws.merge_cells(start_row=info_r, start_column=mid_start, end_row=info_r, end_column=mid_end)
-    ws.merge_cells(start_row=info_r, start_column=right_start, end_row=info_r, end_column=ncols)
+    # Column letters for every column any sheet touches (the Weights map columns sit furthest
+    # right), looked up by index instead of recomputed for each address.
+    col_letter = [""] + [get_column_letter(c) for c in range(1, len(options) + 8)]
 
-    ws.cell(row=info_r, column=1, value=f"Project Name: {project_name}").font = Font(bold=True, size=14)
+    wb = Workbook(write_only=True)
+    # openpyxl writes formulas without cached results, so the Summary and Weights & SAW cells
+    # stay empty to anything reading the file with data_only until a spreadsheet app recalculates.
+    # They must stay formulas: ratings, weights and headers are edited after download. openpyxl's
+    # default calcPr already sets fullCalcOnLoad, so Excel recalculates them on open.
+    ws = wb.create_sheet("Matrix")
+    mx = _RowBuffer(ws)
 
-    cC = ws.cell(row=info_r, column=mid_start, value=f"Project Location: {project_location}")
-    cC.font = Font(bold=True, size=14)
-    cC.alignment = Alignment(horizontal="center", vertical="center")
+    ncols = 2 + len(options)
 
-    cR = ws.cell(row=info_r, column=right_start, value=f"Date: {date.today():%B %d, %Y}")
-    cR.font = Font(bold=True, size=14)
-    cR.alignment = Alignment(horizontal="right", vertical="center")
+    _write_title(mx, 1, ncols, TITLE)
+    _write_project_header(mx, 2, ncols, project_name, project_location, today_str)
 
     hr = 4
 
     def style_hdr(r, c, text=None):
-        cell = ws.cell(row=r, column=c, value=text if text else None)
-        if text:
-            cell.font = Font(bold=True, size=HEADER_FONT_SIZE)
-        cell.alignment = CENTER
-        return cell
+        return mx.set_cell(r, c, text if text else None, font=BOLD_HDR if text else None, alignment=CENTER)
 
     style_hdr(hr, 1, text=None)
 
@@ -190,14 +332,10 @@ def generate_cba_from_uploaded_template(
         style_hdr(hr, 2 + idx, f"Option {idx} - {name}")
 
     desc_idx, consid_idx, other_idx = [], [], []
+    section_idx = {"desc": desc_idx, "consid": consid_idx}
 
     for i, lab in enumerate(lower):
-        if lab in DESC_ROWS:
-            desc_idx.append(i)
-        elif lab in CONSID_ROWS:
-            consid_idx.append(i)
-        else:
-            other_idx.append(i)
+        section_idx.get(_ROW_SECTION.get(lab), other_idx).append(i)
 
     first_section_name = f"{purpose} Description"
     order = [(first_section_name, desc_idx), ("Construction Considerations", consid_idx + other_idx)]
@@ -205,6 +343,8 @@ def generate_cba_from_uploaded_template(
     r = hr + 1
     upper_cells_by_col = {j: [] for j in range(1, len(options) + 1)}
     attr_names_cc = []
+    # First Matrix row of each lowercased label, so later sheets never scan the layout.
+    label_row_by_lower = {}
 
     for section_name, idxs in order:
         if not idxs:
@@ -217,47 +357,42 @@ def generate_cba_from_uploaded_template(
             label_key = label.strip().lower()
             is_cc = section_name == "Construction Considerations"
 
+            label_row_by_lower.setdefault(label_key, r)
+
             if is_cc:
                 upper_r, lower_r = r, r + 1
                 attr_names_cc.append(label)
 
-                ws.merge_cells(start_row=upper_r, start_column=2, end_row=lower_r, end_column=2)
+                mx.merge_cells(start_row=upper_r, start_column=2, end_row=lower_r, end_column=2)
 
-                labcell = ws.cell(row=upper_r, column=2, value=label)
-                labcell.font = Font(bold=True)
-                labcell.fill = PatternFill("solid", fgColor=ROWLABEL_FILL)
-                labcell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+                mx.set_cell(upper_r, 2, label, font=BOLD, fill=ROWLABEL_PF, alignment=LABEL_LEFT)
 
                 for j in range(1, len(options) + 1):
-                    df_col = 1 + (j - 1)
                     excel_col = 2 + j
 
-                    raw = df0.iat[i, df_col] if df_col < df0.shape[1] else ""
-                    rating_word, desc = split_rating_and_desc(raw)
+                    rating_word, desc = parsed[i][j - 1]
 
-                    ws.cell(row=upper_r, column=excel_col, value=rating_word).alignment = CENTER
-                    upper_cells_by_col[j].append(f"{get_column_letter(excel_col)}{upper_r}")
+                    mx.set_cell(upper_r, excel_col, rating_word, alignment=CENTER)
+                    upper_cells_by_col[j].append(f"{col_letter[excel_col]}{upper_r}")
 
                     # IMPORTANT:
                     # Do not bulletize Construction Consideration descriptions.
                     # Bullet points are only for Advantages and Disadvantages.
                     desc_text = bulletize(desc) if label_key in BULLET_ROWS else desc
-                    ws.cell(row=lower_r, column=excel_col, value=desc_text).alignment = LEFT
+                    mx.set_cell(lower_r, excel_col, desc_text, alignment=LEFT)
 
                 ws.row_dimensions[upper_r].height = 15
                 r += 2
 
             else:
-                ws.cell(row=r, column=2, value=label).alignment = LEFT
-                ws.cell(row=r, column=2).font = Font(bold=True)
-                ws.cell(row=r, column=2).fill = PatternFill("solid", fgColor=ROWLABEL_FILL)
+                mx.set_cell(r, 2, label, font=BOLD, fill=ROWLABEL_PF, alignment=LEFT)
 
                 for j in range(1, len(options) + 1):
                     df_col = 1 + (j - 1)
                     excel_col = 2 + j
 
-                    raw = df0.iat[i, df_col] if df_col < df0.shape[1] else ""
-                    rw, desc = split_rating_and_desc(raw)
+                    raw = raw_arr[i, df_col] if df_col < ncols_df else ""
+                    rw, desc = parsed[i][j - 1]
                     base_text = str(raw or "")
 
                     if label_key in BULLET_ROWS:
@@ -266,57 +401,41 @@ def generate_cba_from_uploaded_template(
                         txt = desc or base_text
 
                     align = CENTER if (desc == "" and rw) else LEFT
-                    ws.cell(row=r, column=excel_col, value=txt).alignment = align
+                    mx.set_cell(r, excel_col, txt, alignment=align)
 
                 r += 1
 
         end_r_section = r - 1
 
-        ws.merge_cells(start_row=start_r_section, start_column=1, end_row=end_r_section, end_column=1)
-        band = ws.cell(row=start_r_section, column=1, value=section_name)
-        band.fill = PatternFill("solid", fgColor=SECTION_BAND_FILL)
-        band.font = Font(bold=True)
-        band.alignment = VERT_CENTER
+        mx.merge_cells(start_row=start_r_section, start_column=1, end_row=end_r_section, end_column=1)
+        mx.set_cell(start_r_section, 1, section_name, font=BOLD, fill=BAND_PF, alignment=VERT_CENTER)
 
     table_end_row = r - 1
 
-    disadv_row_top = None
+    disadv_row_top = label_row_by_lower.get("disadvantages")
 
-    try:
-        disadv_idx = next((i for i, lab in enumerate(lower) if lab.strip().lower() == "disadvantages"))
-    except StopIteration:
-        disadv_idx = None
+    # Left/right sides only depend on the column and top/bottom only on the row.
+    last_col = 2 + len(options)
+    left_of_col = [
+        "thick" if cc == 1 else ("medium" if 3 <= cc < last_col else "thin") for cc in range(1, last_col + 1)
+    ]
+    right_of_col = ["thick" if cc == last_col else "thin" for cc in range(1, last_col + 1)]
+    top_of_row = ["thick" if rr == hr else "thin" for rr in range(hr, table_end_row + 1)]
+    bottom_of_row = ["thick" if rr == table_end_row else "thin" for rr in range(hr, table_end_row + 1)]
 
-    if disadv_idx is not None:
-        for row_num in range(hr + 1, table_end_row + 1):
-            if str(ws.cell(row=row_num, column=2).value).strip() == str(labels[disadv_idx]).strip():
-                disadv_row_top = row_num
-                break
+    if disadv_row_top and disadv_row_top + 1 <= table_end_row:
+        top_of_row[disadv_row_top + 1 - hr] = "thick"
 
     for rr in range(hr, table_end_row + 1):
-        for cc in range(1, 2 + len(options) + 1):
-            left_b = THICK if cc == 1 else THIN
-            right_b = THICK if cc == (2 + len(options)) else THIN
-            top_b = THICK if rr == hr else THIN
-            bottom_b = THICK if rr == table_end_row else THIN
-
-            if cc >= 3 and cc < (2 + len(options)):
-                left_b = MEDIUM
-
-            if disadv_row_top and rr == disadv_row_top + 1:
-                top_b = THICK
-
-            ws.cell(row=rr, column=cc).border = Border(
-                left=left_b,
-                right=right_b,
-                top=top_b,
-                bottom=bottom_b,
-            )
+        top_b, bottom_b = top_of_row[rr - hr], bottom_of_row[rr - hr]
+
+        for cc in range(1, last_col + 1):
+            mx.set_cell(rr, cc, border=BORDERS[left_of_col[cc - 1], right_of_col[cc - 1], top_b, bottom_b])
 
     ws.column_dimensions["A"].width = 5
 
     for col in range(2, 2 + len(options) + 1):
-        ws.column_dimensions[get_column_letter(col)].width = 35
+        ws.column_dimensions[col_letter[col]].width = 35
 
     dv = DataValidation(
         type="list",
@@ -329,18 +448,20 @@ def generate_cba_from_uploaded_template(
         prompt="Pick a rating.",
     )
 
-    ws.add_data_validation(dv)
+    ws.data_validations.append(dv)
 
-    for j in range(1, len(options) + 1):
-        for addr in upper_cells_by_col[j]:
-            dv.add(addr)
+    rating_cells = [addr for j in range(1, len(options) + 1) for addr in upper_cells_by_col[j]]
+
+    for addr in rating_cells:
+        dv.add(addr)
+
+    # The rating rules do not depend on the cell, so one rule per word covers every rating cell.
+    if rating_cells:
+        rating_range = " ".join(rating_cells)
 
-            for word, hexcol in RATING_COLOR.items():
-                dxf = DifferentialStyle(
-                    fill=PatternFill(fill_type="solid", start_color=hexcol, end_color=hexcol)
-                )
-                rule = Rule(type="cellIs", operator="equal", formula=[f'"{word}"'], dxf=dxf)
-                ws.conditional_formatting.add(addr, rule)
+        for word, hexcol in RATING_COLOR.items():
+            rule = Rule(type="cellIs", operator="equal", formula=[f'"{word}"'], dxf=_fill_dxf(hexcol))
+            ws.conditional_formatting.add(rating_range, rule)
 
     ws.freeze_panes = "C5"
     ws.page_setup.orientation = "landscape"
@@ -352,37 +473,34 @@ def generate_cba_from_uploaded_template(
     # Weights & SAW
     # =========================
     wsw = wb.create_sheet("Weights & SAW")
+    mw = _RowBuffer(wsw)
 
     opt_headers = [f"NormScore - {opt}" for opt in options]
     headers = ["Attribute", "Active?", "Importance (1–5)", "Weight (normalized)"] + opt_headers
 
-    wsw.append(headers)
-
-    for c in range(1, len(headers) + 1):
-        h = wsw.cell(row=1, column=c)
-        h.font = Font(bold=True)
-        h.alignment = CENTER
+    for c, text in enumerate(headers, start=1):
+        mw.set_cell(1, c, text, font=BOLD, alignment=CENTER)
 
     first_norm_col = 5
     last_norm_col = 4 + len(options)
 
     map_col = last_norm_col + 2
 
-    wsw.cell(row=1, column=map_col, value="Rating").font = Font(bold=True)
-    wsw.cell(row=1, column=map_col + 1, value="Raw").font = Font(bold=True)
+    mw.set_cell(1, map_col, "Rating", font=BOLD, alignment=CENTER)
+    mw.set_cell(1, map_col + 1, "Raw", font=BOLD, alignment=CENTER)
 
     for r0, (name, val) in enumerate(
         [("Poor", 1), ("Fair", 2), ("Good", 3), ("Very Good", 4), ("Excellent", 5)],
         start=2,
     ):
-        wsw.cell(row=r0, column=map_col, value=name)
-        wsw.cell(row=r0, column=map_col + 1, value=val)
+        mw.set_cell(r0, map_col, name, alignment=CENTER)
+        mw.set_cell(r0, map_col + 1, val, alignment=CENTER)
 
     dv_active = DataValidation(type="list", formula1='"Yes,No"', allow_blank=False)
     dv_import = DataValidation(type="list", formula1='"1,2,3,4,5"', allow_blank=False)
 
-    wsw.add_data_validation(dv_active)
-    wsw.add_data_validation(dv_import)
+    wsw.data_validations.append(dv_active)
+    wsw.data_validations.append(dv_import)
 
     n_attr = len(attr_names_cc)
     default_importance = 3
@@ -391,88 +509,84 @@ def generate_cba_from_uploaded_template(
     imp_rng = f"$C$2:$C${1 + n_attr}"
     w_rng = f"$D$2:$D${1 + n_attr}"
 
+    # The rating map lookup ranges are the same for every attribute and option.
+    map_r_range = f"${col_letter[map_col]}$2:${col_letter[map_col]}$6"
+    map_v_range = f"${col_letter[map_col + 1]}$2:${col_letter[map_col + 1]}$6"
+
     for i, attr in enumerate(attr_names_cc, start=2):
-        wsw.cell(row=i, column=1, value=attr)
+        mw.set_cell(i, 1, attr, alignment=CENTER)
 
-        wsw.cell(row=i, column=2, value="Yes")
+        mw.set_cell(i, 2, "Yes", alignment=CENTER)
         dv_active.add(f"B{i}")
 
-        wsw.cell(row=i, column=3, value=default_importance)
+        mw.set_cell(i, 3, default_importance, alignment=CENTER)
         dv_import.add(f"C{i}")
 
-        wsw.cell(
-            row=i,
-            column=4,
-            value=(
+        mw.set_cell(
+            i,
+            4,
+            (
                 f'=IF(SUMPRODUCT(({active_rng}="Yes")*({imp_rng}))=0,0,'
                 f'IF(B{i}="Yes",C{i},0)/SUMPRODUCT(({active_rng}="Yes")*({imp_rng})))'
             ),
+            alignment=CENTER,
         )
 
         for j in range(1, len(options) + 1):
             col_idx = 4 + j
             addr_rating = upper_cells_by_col[j][i - 2]
-            mapR = get_column_letter(map_col)
-            mapV = get_column_letter(map_col + 1)
 
             formula = (
-                f"=MAX(0,(IFERROR(INDEX(${mapV}$2:${mapV}$6,"
-                f"MATCH('Matrix'!{addr_rating},${mapR}$2:${mapR}$6,0)),0)-1)/4)"
+                f"=MAX(0,(IFERROR(INDEX({map_v_range},"
+                f"MATCH('Matrix'!{addr_rating},{map_r_range},0)),0)-1)/4)"
             )
 
-            wsw.cell(row=i, column=col_idx, value=formula)
+            mw.set_cell(i, col_idx, formula, alignment=CENTER)
 
     total_row = 2 + n_attr
-    wsw.cell(row=total_row, column=1, value="SAW Score")
+    mw.set_cell(total_row, 1, "SAW Score", alignment=CENTER)
 
     for j in range(1, len(options) + 1):
         col_idx = 4 + j
         total_formula = (
-            f"=SUMPRODUCT({w_rng},{get_column_letter(col_idx)}2:"
-            f"{get_column_letter(col_idx)}{1 + n_attr})"
+            f"=SUMPRODUCT({w_rng},{col_letter[col_idx]}2:"
+            f"{col_letter[col_idx]}{1 + n_attr})"
         )
-        wsw.cell(row=total_row, column=col_idx, value=total_formula)
+        mw.set_cell(total_row, col_idx, total_formula, alignment=CENTER)
 
     rank_row2 = total_row + 1
-    wsw.cell(row=rank_row2, column=1, value="Rank")
+    mw.set_cell(rank_row2, 1, "Rank", alignment=CENTER)
 
-    rank_range = f"${get_column_letter(first_norm_col)}${total_row}:${get_column_letter(last_norm_col)}${total_row}"
+    rank_range = f"${col_letter[first_norm_col]}${total_row}:${col_letter[last_norm_col]}${total_row}"
 
     for j in range(first_norm_col, last_norm_col + 1):
-        saw_cell = f"{get_column_letter(j)}{total_row}"
-        wsw.cell(row=rank_row2, column=j, value=f"=RANK({saw_cell},{rank_range},0)")
+        saw_cell = f"{col_letter[j]}{total_row}"
+        mw.set_cell(rank_row2, j, f"=RANK({saw_cell},{rank_range},0)", alignment=CENTER)
 
     score10_row = total_row + 2
-    wsw.cell(row=score10_row, column=1, value="Score (0–10)")
+    mw.set_cell(score10_row, 1, "Score (0–10)", alignment=CENTER)
 
     for j in range(first_norm_col, last_norm_col + 1):
-        saw_cell = f"{get_column_letter(j)}{total_row}"
-        wsw.cell(row=score10_row, column=j, value=f"=ROUND(10*{saw_cell},0)")
+        saw_cell = f"{col_letter[j]}{total_row}"
+        mw.set_cell(score10_row, j, f"=ROUND(10*{saw_cell},0)", alignment=CENTER)
 
     sumw_row = score10_row + 1
-    wsw.cell(row=sumw_row, column=1, value="Sum of normalized weights")
-    wsw.cell(row=sumw_row, column=2, value=f"=SUM({w_rng})")
+    mw.set_cell(sumw_row, 1, "Sum of normalized weights", alignment=CENTER)
+    mw.set_cell(sumw_row, 2, f"=SUM({w_rng})", alignment=CENTER)
 
     for rr in range(2, 2 + n_attr):
-        wsw.cell(row=rr, column=4).number_format = "0.00"
+        mw.set_cell(rr, 4, number_format="0.00")
 
     for j in range(first_norm_col, last_norm_col + 1):
-        wsw.cell(row=total_row, column=j).number_format = "0.00"
-
-    max_col = max(last_norm_col, map_col + 1)
-    max_row = sumw_row
-
-    for rr in range(1, max_row + 1):
-        for cc in range(1, max_col + 1):
-            wsw.cell(row=rr, column=cc).alignment = CENTER
+        mw.set_cell(total_row, j, number_format="0.00")
 
     widths = [34, 10, 18, 18] + [18] * len(options)
 
     for c, wid in enumerate(widths, start=1):
-        wsw.column_dimensions[get_column_letter(c)].width = wid
+        wsw.column_dimensions[col_letter[c]].width = wid
 
-    wsw.column_dimensions[get_column_letter(map_col)].width = 12
-    wsw.column_dimensions[get_column_letter(map_col + 1)].width = 9
+    wsw.column_dimensions[col_letter[map_col]].width = 12
+    wsw.column_dimensions[col_letter[map_col + 1]].width = 9
     wsw.freeze_panes = "A2"
 
     bands = [
@@ -483,116 +597,74 @@ def generate_cba_from_uploaded_template(
         (8, 11, "19CB01"),
     ]
 
-    for j in range(1, len(options) + 1):
-        hdr_col = 2 + j
-        hdr_cell = f"{get_column_letter(hdr_col)}{hr}"
-        saw_cell = f"'Weights & SAW'!{get_column_letter(4 + j)}${total_row}"
-
-        for lo, hi, hexcol in bands:
-            expr = f"=AND(10*{saw_cell}>={lo},10*{saw_cell}<{hi})"
-            dxf = DifferentialStyle(
-                fill=PatternFill(fill_type="solid", start_color=hexcol, end_color=hexcol)
-            )
-            rule = Rule(type="expression", dxf=dxf, formula=[expr])
-            ws.conditional_formatting.add(hdr_cell, rule)
+    # One rule per band over the whole header row: the column-relative SAW reference is written
+    # for the first option and Excel shifts it along with each header cell.
+    hdr_range = f"{col_letter[3]}{hr}:{col_letter[2 + len(options)]}{hr}"
+    saw_cell = f"'Weights & SAW'!{col_letter[5]}${total_row}"
+
+    for lo, hi, hexcol in bands:
+        expr = f"=AND(10*{saw_cell}>={lo},10*{saw_cell}<{hi})"
+        rule = Rule(type="expression", dxf=_fill_dxf(hexcol), formula=[expr])
+        ws.conditional_formatting.add(hdr_range, rule)
 
     # =========================
     # Summary CBA
     # =========================
     ws_sum = wb.create_sheet("Summary CBA")
-
-    CENTER_SUM = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    LEFT_SUM = Alignment(horizontal="left", vertical="top", wrap_text=True)
+    ms = _RowBuffer(ws_sum)
 
     ncols_sum = 1 + len(options)
 
-    ws_sum.merge_cells(start_row=1, start_column=1, end_row=1, end_column=ncols_sum)
-    t2 = ws_sum.cell(row=1, column=1, value=TITLE)
-    t2.font = Font(bold=True, size=TITLE_SIZE)
-    t2.alignment = Alignment(horizontal="center", vertical="center")
-
-    left_end_s = max(2, int(ncols_sum * 0.25))
-    right_start_s = max(left_end_s + 1, ncols_sum - max(2, int(ncols_sum * 0.25)) + 1)
-    mid_start_s = left_end_s + 1
-    mid_end_s = right_start_s - 1
-
-    ws_sum.merge_cells(start_row=2, start_column=1, end_row=2, end_column=left_end_s)
-    ws_sum.merge_cells(start_row=2, start_column=mid_start_s, end_row=2, end_column=mid_end_s)
-    ws_sum.merge_cells(start_row=2, start_column=right_start_s, end_row=2, end_column=ncols_sum)
-
-    ws_sum.cell(row=2, column=1, value=f"Project Name: {project_name}").font = Font(bold=True, size=14)
-
-    c_mid = ws_sum.cell(row=2, column=mid_start_s, value=f"Project Location: {project_location}")
-    c_mid.font = Font(bold=True, size=14)
-    c_mid.alignment = Alignment(horizontal="center", vertical="center")
-
-    c_rt = ws_sum.cell(row=2, column=right_start_s, value=f"Date: {date.today():%B %d, %Y}")
-    c_rt.font = Font(bold=True, size=14)
-    c_rt.alignment = Alignment(horizontal="right", vertical="center")
+    _write_title(ms, 1, ncols_sum, TITLE)
+    _write_project_header(ms, 2, ncols_sum, project_name, project_location, today_str)
 
     row_ill, row_opt, row_desc, row_score, row_summary = 4, 5, 6, 7, 8
 
     labels_summary = ["Illustration", "Option", "Description", "Score", "Summary"]
 
     for rr, lab in zip([row_ill, row_opt, row_desc, row_score, row_summary], labels_summary):
-        cell = ws_sum.cell(row=rr, column=1, value=lab)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-        cell.fill = PatternFill("solid", fgColor=ROWLABEL_FILL)
+        ms.set_cell(rr, 1, lab, font=BOLD, fill=ROWLABEL_PF, alignment=LABEL_LEFT)
 
-    def find_matrix_row(label_lower: str):
-        for rr in range(hr + 1, table_end_row + 1):
-            val = ws.cell(row=rr, column=2).value
-            if str(val).strip().lower() == label_lower:
-                return rr
-        return None
-
-    matrix_row_ill = find_matrix_row("illustration")
+    matrix_row_ill = label_row_by_lower.get("illustration")
 
     if matrix_row_ill:
         for j in range(1, len(options) + 1):
-            ws_sum.cell(
-                row=row_ill,
-                column=1 + j,
-                value=f"='Matrix'!{get_column_letter(2 + j)}{matrix_row_ill}",
-            ).alignment = CENTER_SUM
+            ms.set_cell(
+                row_ill,
+                1 + j,
+                f"='Matrix'!{col_letter[2 + j]}{matrix_row_ill}",
+                alignment=CENTER,
+            )
 
     for j in range(1, len(options) + 1):
-        c = ws_sum.cell(row=row_opt, column=1 + j, value=f"='Matrix'!{get_column_letter(2 + j)}{hr}")
-        c.font = Font(bold=True)
-        c.alignment = CENTER_SUM
+        ms.set_cell(row_opt, 1 + j, f"='Matrix'!{col_letter[2 + j]}{hr}", font=BOLD, alignment=CENTER)
 
-    for j in range(1, len(options) + 1):
-        hdr_cell = f"{get_column_letter(1 + j)}{row_opt}"
-        saw_cell = f"'Weights & SAW'!{get_column_letter(4 + j)}{total_row}"
+    opt_range = f"{col_letter[2]}{row_opt}:{col_letter[1 + len(options)]}{row_opt}"
+    saw_cell = f"'Weights & SAW'!{col_letter[5]}{total_row}"
 
-        for lo, hi, hexcol in bands:
-            expr = f"=AND(10*{saw_cell}>={lo},10*{saw_cell}<{hi})"
-            dxf = DifferentialStyle(
-                fill=PatternFill(fill_type="solid", start_color=hexcol, end_color=hexcol)
-            )
-            rule = Rule(type="expression", dxf=dxf, formula=[expr])
-            ws_sum.conditional_formatting.add(hdr_cell, rule)
+    for lo, hi, hexcol in bands:
+        expr = f"=AND(10*{saw_cell}>={lo},10*{saw_cell}<{hi})"
+        rule = Rule(type="expression", dxf=_fill_dxf(hexcol), formula=[expr])
+        ws_sum.conditional_formatting.add(opt_range, rule)
 
     use_label = "scheme" if "scheme" in lower else ("description" if "description" in lower else None)
-    matrix_row_desc = find_matrix_row(use_label) if use_label else None
+    matrix_row_desc = label_row_by_lower.get(use_label) if use_label else None
 
     if matrix_row_desc:
         for j in range(1, len(options) + 1):
-            ws_sum.cell(
-                row=row_desc,
-                column=1 + j,
-                value=f"='Matrix'!{get_column_letter(2 + j)}{matrix_row_desc}",
-            ).alignment = LEFT_SUM
+            ms.set_cell(
+                row_desc,
+                1 + j,
+                f"='Matrix'!{col_letter[2 + j]}{matrix_row_desc}",
+                alignment=LEFT,
+            )
 
     for j in range(1, len(options) + 1):
         colW = 4 + j
         colS = 1 + j
-        formula = f"='Weights & SAW'!{get_column_letter(colW)}{total_row}"
+        formula = f"='Weights & SAW'!{col_letter[colW]}{total_row}"
 
-        c = ws_sum.cell(row=row_score, column=colS, value=formula)
-        c.number_format = "0%"
-        c.alignment = CENTER_SUM
+        ms.set_cell(row_score, colS, formula, alignment=CENTER, number_format="0%")
 
     bands_pct = [
         (0, 0.20, "FFC000"),
@@ -602,62 +674,58 @@ def generate_cba_from_uploaded_template(
         (0.80, 1.01, "19CB01"),
     ]
 
-    for j in range(1, len(options) + 1):
-        addr = f"{get_column_letter(1 + j)}{row_score}"
-
-        for lo, hi, hexcol in bands_pct:
-            expr = f"=AND({addr}>={lo},{addr}<{hi})"
-            dxf = DifferentialStyle(
-                fill=PatternFill(fill_type="solid", start_color=hexcol, end_color=hexcol)
-            )
-            ws_sum.conditional_formatting.add(addr, Rule(type="expression", dxf=dxf, formula=[expr]))
-
-    adv_row = find_matrix_row("advantages")
-    dis_row = find_matrix_row("disadvantages")
+    score_range = f"{col_letter[2]}{row_score}:{col_letter[1 + len(options)]}{row_score}"
+    addr = f"{col_letter[2]}{row_score}"
+
+    for lo, hi, hexcol in bands_pct:
+        expr = f"=AND({addr}>={lo},{addr}<{hi})"
+        rule = Rule(type="expression", dxf=_fill_dxf(hexcol), formula=[expr])
+        ws_sum.conditional_formatting.add(score_range, rule)
+
+    adv_row = label_row_by_lower.get("advantages")
+    dis_row = label_row_by_lower.get("disadvantages")
+
+    # Which Pros/Cons branches apply is the same for every option; pick the template once and
+    # only fill in the per-option Matrix references below.
+    if adv_row and dis_row:
+        summary_template = (
+            '=IF(OR(LEN({adv})>0,LEN({dis})>0),'
+            'IF(LEN({adv})>0,"Pros:"&CHAR(10)&{adv},"")'
+            '&IF(AND(LEN({adv})>0,LEN({dis})>0),CHAR(10)&CHAR(10),"")'
+            '&IF(LEN({dis})>0,"Cons:"&CHAR(10)&{dis},""),"")'
+        )
+    elif adv_row:
+        summary_template = '=IF(LEN({adv})>0,"Pros:"&CHAR(10)&{adv},"")'
+    elif dis_row:
+        summary_template = '=IF(LEN({dis})>0,"Cons:"&CHAR(10)&{dis},"")'
+    else:
+        summary_template = '=""'
 
     for j in range(1, len(options) + 1):
-        adv_ref = f"'Matrix'!{get_column_letter(2 + j)}{adv_row}" if adv_row else '""'
-        dis_ref = f"'Matrix'!{get_column_letter(2 + j)}{dis_row}" if dis_row else '""'
+        adv_ref = f"'Matrix'!{col_letter[2 + j]}{adv_row}" if adv_row else '""'
+        dis_ref = f"'Matrix'!{col_letter[2 + j]}{dis_row}" if dis_row else '""'
+        formula = summary_template.format(adv=adv_ref, dis=dis_ref)
 
-        if adv_row and dis_row:
-            formula = (
-                f'=IF(OR(LEN({adv_ref})>0,LEN({dis_ref})>0),'
-                f'IF(LEN({adv_ref})>0,"Pros:"&CHAR(10)&{adv_ref},"")'
-                f'&IF(AND(LEN({adv_ref})>0,LEN({dis_ref})>0),CHAR(10)&CHAR(10),"")'
-                f'&IF(LEN({dis_ref})>0,"Cons:"&CHAR(10)&{dis_ref},""),"")'
-            )
-        elif adv_row:
-            formula = f'=IF(LEN({adv_ref})>0,"Pros:"&CHAR(10)&{adv_ref},"")'
-        elif dis_row:
-            formula = f'=IF(LEN({dis_ref})>0,"Cons:"&CHAR(10)&{dis_ref},"")'
-        else:
-            formula = '=""'
-
-        ws_sum.cell(row=row_summary, column=1 + j, value=formula).alignment = LEFT_SUM
+        ms.set_cell(row_summary, 1 + j, formula, alignment=LEFT)
 
     last_col_sum = 1 + len(options)
 
+    left_of_col = [
+        "thick" if cc == 1 else ("medium" if cc < last_col_sum else "thin") for cc in range(1, last_col_sum + 1)
+    ]
+    right_of_col = ["thick" if cc == last_col_sum else "thin" for cc in range(1, last_col_sum + 1)]
+
     for rr in range(row_ill, row_summary + 1):
+        top_b = "thick" if rr == row_ill else "thin"
+        bottom_b = "thick" if rr == row_summary else "thin"
+
         for cc in range(1, last_col_sum + 1):
-            left_b = THICK if cc == 1 else THIN
-            right_b = THICK if cc == last_col_sum else THIN
-            top_b = THICK if rr == row_ill else THIN
-            bottom_b = THICK if rr == row_summary else THIN
-
-            if cc >= 2 and cc < last_col_sum:
-                left_b = MEDIUM
-
-            ws_sum.cell(row=rr, column=cc).border = Border(
-                left=left_b,
-                right=right_b,
-                top=top_b,
-                bottom=bottom_b,
-            )
+            ms.set_cell(rr, cc, border=BORDERS[left_of_col[cc - 1], right_of_col[cc - 1], top_b, bottom_b])
 
     ws_sum.column_dimensions["A"].width = 18
 
     for col in range(2, last_col_sum + 1):
-        ws_sum.column_dimensions[get_column_letter(col)].width = 35
+        ws_sum.column_dimensions[col_letter[col]].width = 35
 
     ws_sum.freeze_panes = "B4"
 
@@ -670,7 +738,10 @@ def generate_cba_from_uploaded_template(
     ws_sum.row_dimensions[row_score].height = 22
     ws_sum.row_dimensions[row_summary].height = 160
 
-    out_name = safe_name(f"TEG CBA Matrix-{purpose}-{project_name}-{date.today():%m%d%Y}") + ".xlsx"
+    out_name = safe_name(f"TEG CBA Matrix-{purpose}-{project_name}-{today:%m%d%Y}") + ".xlsx"
+
+    for buf in (mx, mw, ms):
+        buf.flush()
 
     bio = BytesIO()
     wb.save(bio)